@@ -3,8 +3,9 @@ import os
 import json
 import hashlib
 import time  # Use the module, not the function
-from typing import List, Dict, Optional
-from dataclasses import dataclass, asdict
+import threading
+from typing import List, Dict, Optional, Tuple
+from dataclasses import dataclass
 from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric import ec
 from cryptography.hazmat.backends import default_backend
@@ -13,6 +14,11 @@ from ..storage import ChainStorage
 from ..mining.miner import Miner
 from modules.utils.print_utils import print_success, print_error, print_warning, print_info
 
+# Reused encoder for block hashing; emits the same bytes as json.dumps(..., sort_keys=True)
+_canonical_json = json.JSONEncoder(sort_keys=True).encode
+# Encoder for serving blocks; matches the compact JSON FastAPI renders responses with
+_response_json = json.JSONEncoder(ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode
+
 @dataclass
 class Transaction:
     sender: str
@@ -22,7 +28,14 @@ class Transaction:
     signature: Optional[str] = None
 
     def to_dict(self) -> Dict:
-        return asdict(self)
+        # Fields are all scalars, so a literal matches asdict without its deep copy
+        return {
+            'sender': self.sender,
+            'recipient': self.recipient,
+            'amount': self.amount,
+            'timestamp': self.timestamp,
+            'signature': self.signature
+        }
 
     def sign(self, private_key: str) -> None:
         """Sign the transaction with the sender's private key."""
@@ -74,33 +87,39 @@ class Block:
     block_hash: str = ""  # Store the calculated hash
 
     def to_dict(self) -> Dict:
+        transactions = [tx.to_dict() for tx in self.transactions]
         return {
             'index': self.index,
             'timestamp': self.timestamp,
-            'transactions': [tx.to_dict() for tx in self.transactions],
+            'transactions': transactions,
             'previous_hash': self.previous_hash,
             'nonce': self.nonce,
-            'hash': self.hash(),
+            'hash': self._hash_with(transactions),
             'merkle_root': self.merkle_root
         }
 
     def hash(self) -> str:
         """Calculate the block's hash."""
-        block_string = json.dumps({
+        return self._hash_with([tx.to_dict() for tx in self.transactions])
+
+    def _hash_with(self, transactions: List[Dict]) -> str:
+        """Calculate the block's hash from its already-serialized transactions."""
+        block_string = _canonical_json({
             'index': self.index,
             'timestamp': str(self.timestamp),
-            'transactions': [tx.to_dict() for tx in self.transactions],
+            'transactions': transactions,
             'previous_hash': self.previous_hash,
             'nonce': self.nonce,
             'merkle_root': self.merkle_root
-        }, sort_keys=True).encode()
+        }).encode()
         return hashlib.sha256(block_string).hexdigest()
 
     def mine_block(self) -> None:
         """Mine the block by finding a valid nonce."""
         target = '0' * self.difficulty
+        transactions = [tx.to_dict() for tx in self.transactions]  # Fixed while only the nonce changes
         while True:
-            if self.hash()[:self.difficulty] == target:
+            if self._hash_with(transactions)[:self.difficulty] == target:
                 break
             self.nonce += 1
 
@@ -138,6 +157,11 @@ class Blockchain:
         self.chain = []
         self.pending_transactions = []
         self.storage = ChainStorage()
+        # Memoized JSON of already-served blocks, kept aligned with self.chain by identity
+        self._encoded_lock = threading.Lock()
+        self._encoded_blocks: List[Block] = []
+        self._encoded_parts: List[str] = []
+        self._encoded_chain: Optional[str] = None
         self.initialize()
 
     def initialize(self) -> bool:
@@ -390,6 +414,30 @@ class Blockchain:
         """Get the entire blockchain."""
         return [block.to_dict() for block in self.chain]
 
+    def get_chain_json(self) -> Tuple[str, int]:
+        """Get the entire blockchain as a JSON array along with its length.
+
+        Blocks do not change once appended, so each one is encoded only the first
+        time it is served; later calls reuse the cached text and only encode blocks
+        that were appended or replaced since.
+        """
+        with self._encoded_lock:
+            chain = list(self.chain)
+            blocks = self._encoded_blocks
+            parts = self._encoded_parts
+            keep = 0
+            limit = min(len(blocks), len(chain))
+            while keep < limit and blocks[keep] is chain[keep]:
+                keep += 1
+            if self._encoded_chain is None or keep != len(blocks) or keep != len(chain):
+                del blocks[keep:]
+                del parts[keep:]
+                for block in chain[keep:]:
+                    blocks.append(block)
+                    parts.append(_response_json(block.to_dict()))
+                self._encoded_chain = '[' + ','.join(parts) + ']'
+            return self._encoded_chain, len(chain)
+
     def get_balance(self, address: str) -> float:
         """Calculate the balance of an address."""
         balance = 0.0
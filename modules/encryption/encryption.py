@@ -25,6 +25,7 @@ from cryptography.hazmat.primitives import hashes, serialization
 from cryptography.hazmat.primitives.asymmetric import rsa, padding
 from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
 from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+from cryptography.hazmat.primitives.ciphers.aead import AESGCM
 from cryptography.hazmat.backends import default_backend
 import base64
 import json
@@ -71,6 +72,7 @@ class Encryption:
 
         # Generate AES key for private key encryption
         self.aes_key = os.urandom(32)  # 256-bit key
+        self.aesgcm = AESGCM(self.aes_key)
 
         # Save keys with backup
         self._save_keys()
@@ -128,6 +130,8 @@ class Encryption:
         )
         
         self.aes_key = base64.b64decode(keys['aes_key'])
+        # One cipher context for every record; AESGCM is safe to share across threads
+        self.aesgcm = AESGCM(self.aes_key)
 
     def encrypt_private_key(self, private_key: str, passphrase: str) -> Dict[str, str]:
         """Encrypt a private key using AES-GCM with passphrase-derived key."""
@@ -210,6 +214,24 @@ class Encryption:
         """Decrypt data using symmetric encryption (Fernet)."""
         return self.fernet.decrypt(encrypted_data.encode('utf-8')).decode('utf-8')
 
+    def encrypt_symmetric_bytes(self, data: bytes) -> bytes:
+        """Encrypt raw bytes using symmetric encryption (Fernet), returning the token in binary form."""
+        return base64.urlsafe_b64decode(self.fernet.encrypt(data))
+
+    def decrypt_symmetric_bytes(self, token: bytes) -> bytes:
+        """Decrypt a binary token from encrypt_symmetric_bytes back to raw bytes."""
+        return self.fernet.decrypt(base64.urlsafe_b64encode(token))
+
+    def encrypt_aead(self, data: bytes) -> bytes:
+        """Encrypt raw bytes with AES-GCM, returning the nonce followed by ciphertext and tag."""
+        nonce = os.urandom(12)
+        return nonce + self.aesgcm.encrypt(nonce, data, None)
+
+    def decrypt_aead(self, data: bytes) -> bytes:
+        """Decrypt bytes from encrypt_aead, raising InvalidTag if they were altered."""
+        data = memoryview(data)
+        return self.aesgcm.decrypt(data[:12], data[12:], None)
+
     def encrypt_asymmetric(self, data: str) -> str:
         """Encrypt data using asymmetric encryption (RSA)."""
         encrypted = self.public_key.encrypt(
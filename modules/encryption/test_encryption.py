@@ -45,6 +45,22 @@ def test_symmetric_encryption(encryption):
     decrypted = encryption.decrypt_symmetric(encrypted)
     assert decrypted == original_data
 
+def test_aead_encryption(encryption):
+    """Test AES-GCM encryption of raw bytes, including tamper detection."""
+    original_data = b"Test data for AES-GCM encryption"
+
+    encrypted = encryption.encrypt_aead(original_data)
+    assert encrypted != encryption.encrypt_aead(original_data)  # Fresh nonce per call
+    assert encryption.decrypt_aead(encrypted) == original_data
+
+    # Keys loaded from the same file decrypt the same records
+    assert Encryption(str(encryption.key_file)).decrypt_aead(encrypted) == original_data
+
+    tampered = bytearray(encrypted)
+    tampered[-1] ^= 1
+    with pytest.raises(Exception):
+        encryption.decrypt_aead(bytes(tampered))
+
 def test_asymmetric_encryption(encryption):
     """Test asymmetric encryption and decryption."""
     original_data = "Test data for asymmetric encryption"
@@ -1,18 +1,55 @@
 import hashlib
 import time
 import json
+import struct
+from functools import lru_cache
 from typing import Dict, Any, Optional, List
 from dataclasses import dataclass
-from datetime import datetime
 import threading
 from ..storage import ChainStorage
 from ..encryption import Encryption
 from modules.utils.print_utils import print_success, print_error, print_warning, print_info
 
+# Fixed-width block header: previous hash and merkle root, then index,
+# timestamp (epoch ns), difficulty and nonce. Transactions are committed via
+# the merkle root. The two hashes fill exactly one 64-byte SHA-256 block, so
+# miners compress it once per template and only hash the tail per nonce.
+HEADER_FMT = struct.Struct('<32s32sQQIQ')
+HEADER_TAIL_FMT = struct.Struct('<QQIQ')
+_ZERO_PREFIXES = tuple('0' * n for n in range(65))  # Hex prefix required at each difficulty
+
+def _hash_field(value: Any, name: str) -> bytes:
+    """Decode a hex hash field, which must fill its 32-byte header slot exactly."""
+    if not isinstance(value, str) or len(value) != 64:
+        raise ValueError(f"{name} must be 64 hex digits")
+    raw = bytes.fromhex(value)  # ValueError on non-hex digits
+    if len(raw) != 32:
+        raise ValueError(f"{name} must be 64 hex digits")
+    return raw
+
+def _int_field(value: Any, name: str) -> int:
+    """Check a header integer; floats, ISO strings and bools from older blocks are refused."""
+    if type(value) is not int:
+        raise ValueError(f"{name} must be an integer, not {type(value).__name__}")
+    return value
+
+@lru_cache(maxsize=None)
+def _pow_target(difficulty: int) -> bytes:
+    """Raw-digest bound for a difficulty: a digest is valid when it compares below it.
+
+    A hex hash with d leading zeros is a 256-bit value under 2**(256 - 4d), and
+    equal-length big-endian bytes order like the integers they encode.
+    """
+    if difficulty <= 0:
+        return b'\xff' * 33  # Above every 32-byte digest
+    if difficulty > 64:
+        return bytes(32)  # Below every digest
+    return (1 << (256 - 4 * difficulty)).to_bytes(32, 'big')
+
 @dataclass
 class Block:
     index: int
-    timestamp: str
+    timestamp: int  # Epoch nanoseconds
     transactions: List[Dict[str, Any]]
     previous_hash: str
     nonce: int
@@ -28,6 +65,7 @@ class Miner:
         self.reward = reward
         self.mining = False
         self.current_block = None
+        self.transaction_pool: List[Dict[str, Any]] = []  # Verified transactions gossiped by peers
         self.lock = threading.Lock()
         self._load_chain_state()
 
@@ -73,7 +111,7 @@ class Miner:
 
     def _create_block(self, transactions: List[Dict[str, Any]]) -> Block:
         """Create a new block with the given transactions."""
-        timestamp = datetime.utcnow().isoformat()
+        timestamp = time.time_ns()
         merkle_root = self._calculate_merkle_root(transactions)
         
         return Block(
@@ -88,32 +126,54 @@ class Miner:
         )
 
     def _calculate_block_hash(self, block: Block) -> str:
-        """Calculate the hash of a block."""
-        block_data = {
-            'index': block.index,
-            'timestamp': block.timestamp,
-            'transactions': block.transactions,
-            'previous_hash': block.previous_hash,
-            'nonce': block.nonce,
-            'difficulty': block.difficulty,
-            'merkle_root': block.merkle_root
-        }
-        return hashlib.sha256(json.dumps(block_data, sort_keys=True).encode()).hexdigest()
+        """Calculate the hash of a block from its packed header.
+
+        Raises ValueError for fields that do not fit the fixed-width header.
+        """
+        try:
+            header = HEADER_FMT.pack(
+                _hash_field(block.previous_hash, 'previous_hash'),
+                _hash_field(block.merkle_root, 'merkle_root'),
+                _int_field(block.index, 'index'),
+                _int_field(block.timestamp, 'timestamp'),
+                _int_field(block.difficulty, 'difficulty'),
+                _int_field(block.nonce, 'nonce')
+            )
+        except struct.error as e:
+            raise ValueError(f"Block header out of range: {e}") from e
+        return hashlib.sha256(header).hexdigest()
+
+    def _header_midstate(self, block: Block):
+        """SHA-256 state after the header's first 64 bytes, which do not change while mining."""
+        return hashlib.sha256(
+            _hash_field(block.previous_hash, 'previous_hash') + _hash_field(block.merkle_root, 'merkle_root')
+        )
+
+    def _digest_from_midstate(self, midstate, block: Block) -> bytes:
+        """Finish a header hash from its midstate as a raw digest of _calculate_block_hash(block)."""
+        h = midstate.copy()
+        h.update(HEADER_TAIL_FMT.pack(block.index, block.timestamp, block.difficulty, block.nonce))
+        return h.digest()
 
     def _is_valid_hash(self, hash_value: str, difficulty: int) -> bool:
         """Check if a hash meets the difficulty requirement."""
-        return hash_value.startswith('0' * difficulty)
+        prefix = _ZERO_PREFIXES[difficulty] if 0 <= difficulty <= 64 else '0' * difficulty
+        return hash_value.startswith(prefix)
 
     def mine_block(self, transactions: List[Dict[str, Any]]) -> Optional[Block]:
         """Mine a new block with the given transactions."""
         start_time = time.time()
         block = self._create_block(transactions)
+        midstate = self._header_midstate(block)
+        target = _pow_target(block.difficulty)
         
         while True:
             block.nonce += 1
-            block.hash = self._calculate_block_hash(block)
+            digest = self._digest_from_midstate(midstate, block)
             
-            if self._is_valid_hash(block.hash, block.difficulty):
+            # Compare raw digests; only a winning nonce is hex-encoded
+            if digest < target:
+                block.hash = digest.hex()
                 block_time = time.time() - start_time
                 self._adjust_difficulty(block_time)
                 
@@ -187,13 +247,16 @@ class Miner:
             while self.mining:
                 # Create new block
                 new_block = self._create_block(transactions)
+                midstate = self._header_midstate(new_block)
+                target = _pow_target(new_block.difficulty)
 
                 # Mine the block
                 while self.mining:
                     new_block.nonce += 1
-                    new_block.hash = self._calculate_block_hash(new_block)
+                    digest = self._digest_from_midstate(midstate, new_block)
                     
-                    if self._is_valid_hash(new_block.hash, new_block.difficulty):
+                    if digest < target:
+                        new_block.hash = digest.hex()
                         # Block mined successfully
                         self.height = new_block.index
                         self.last_block_hash = new_block.hash
@@ -211,7 +274,7 @@ class Miner:
                             'sender': 'network',
                             'recipient': self.storage.miner_address,
                             'amount': self.reward,
-                            'timestamp': datetime.utcnow().isoformat()
+                            'timestamp': time.time()
                         }
                         self.storage.add_transaction(reward_tx)
                         
@@ -234,7 +297,7 @@ def main():
             'sender': 'address1',
             'recipient': 'address2',
             'amount': 10,
-            'timestamp': datetime.utcnow().isoformat()
+            'timestamp': time.time()
         }
     ]
     
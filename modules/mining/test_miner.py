@@ -1,7 +1,8 @@
 import pytest
 import time
 from datetime import datetime
-from .miner import Miner, Block
+from types import SimpleNamespace
+from .miner import Miner, Block, _pow_target
 from ..storage import ChainStorage
 
 @pytest.fixture
@@ -70,6 +71,49 @@ def test_block_hashing(miner):
     assert miner._is_valid_hash(hash_value, 0)  # Should always be valid with difficulty 0
     assert not miner._is_valid_hash(hash_value, 1)  # Should not be valid with difficulty 1
 
+def test_midstate_hash_matches_full_hash(miner):
+    """Test that hashing from the header midstate matches a full header hash."""
+    block = miner._create_block([])
+    midstate = miner._header_midstate(block)
+    for nonce in range(3):
+        block.nonce = nonce
+        assert miner._digest_from_midstate(midstate, block).hex() == miner._calculate_block_hash(block)
+
+def test_known_header_digest(miner):
+    """Test the header hash against a fixed vector so the packed layout cannot drift."""
+    block = SimpleNamespace(
+        previous_hash='00' * 32, merkle_root='11' * 32, index=1,
+        timestamp=1700000000000000000, difficulty=4, nonce=42
+    )
+    assert miner._calculate_block_hash(block) == '802b182eeeca60b5e95d02b68a186c3591abdf23a61ae413954cd521e2e619f3'
+
+@pytest.mark.parametrize('field, value', [
+    ('previous_hash', '00' * 31),  # Would be zero-padded into the 32-byte slot
+    ('merkle_root', '11' * 33),  # Would be truncated
+    ('merkle_root', 'zz' * 32),
+    ('merkle_root', '11 ' * 16 + '1' * 16),  # fromhex skips spaces, leaving 24 bytes
+    ('timestamp', 1700000000.5),
+    ('timestamp', '2024-01-01T00:00:00'),
+    ('nonce', True),
+    ('index', -1),
+])
+def test_malformed_header_rejected(miner, field, value):
+    """Test that header fields which do not fit the packed layout raise ValueError."""
+    header = dict(
+        previous_hash='00' * 32, merkle_root='11' * 32, index=1,
+        timestamp=1700000000000000000, difficulty=4, nonce=42
+    )
+    header[field] = value
+    with pytest.raises(ValueError):
+        miner._calculate_block_hash(SimpleNamespace(**header))
+
+def test_pow_target_matches_hex_prefix():
+    """Test that the raw-digest bound agrees with the leading-zero hex check."""
+    for difficulty in (1, 2, 3, 4):
+        target = _pow_target(difficulty)
+        for digest in (bytes(32), target, bytes.fromhex('0' * difficulty + 'f' * (64 - difficulty))):
+            assert (digest < target) == digest.hex().startswith('0' * difficulty)
+
 def test_mining_process(miner):
     """Test the complete mining process."""
     transactions = [
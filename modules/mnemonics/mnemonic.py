@@ -1,11 +1,18 @@
 import hashlib
 import hmac
 import os
-from typing import List, Optional
+from typing import Dict, List, Optional
 import csv
 from pathlib import Path
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.kdf.pbkdf2 import PBKDF2HMAC
+from cryptography.hazmat.backends import default_backend
 
 class Mnemonic:
+    # Wordlist and its reverse index, loaded once per process
+    _WORDLIST: Optional[List[str]] = None
+    _WORD_TO_INDEX: Optional[Dict[str, int]] = None
+
     def __init__(self):
         self.wordlist = self._load_wordlist()
         self.entropy_bits = 128  # 12 words
@@ -13,15 +20,20 @@ class Mnemonic:
         self.total_bits = self.entropy_bits + self.checksum_bits
         self.word_count = 12     # Number of words in the mnemonic
 
-    def _load_wordlist(self) -> List[str]:
+    @classmethod
+    def _load_wordlist(cls) -> List[str]:
         """Load the BIP39 wordlist from CSV."""
-        wordlist_path = Path(__file__).parent / 'word.csv'
-        with open(wordlist_path, 'r') as f:
-            reader = csv.reader(f)
-            # The CSV has a single row with all words
-            words = next(reader)
-            # Clean up the words (remove quotes and whitespace)
-            return [word.strip().strip('"') for word in words]
+        if cls._WORDLIST is None:
+            wordlist_path = Path(__file__).parent / 'word.csv'
+            with open(wordlist_path, 'r') as f:
+                reader = csv.reader(f)
+                # The CSV has a single row with all words
+                words = next(reader)
+                # Clean up the words (remove quotes and whitespace)
+                wordlist = [word.strip().strip('"') for word in words]
+            cls._WORD_TO_INDEX = {word: i for i, word in enumerate(wordlist)}
+            cls._WORDLIST = wordlist
+        return cls._WORDLIST
 
     def _generate_entropy(self) -> bytes:
         """Generate cryptographically secure random entropy."""
@@ -29,21 +41,15 @@ class Mnemonic:
 
     def _entropy_to_mnemonic(self, entropy: bytes) -> str:
         """Convert entropy to mnemonic phrase."""
-        # Calculate checksum
-        checksum = hashlib.sha256(entropy).digest()[0]
-        checksum_bits = bin(checksum)[2:].zfill(8)[:self.checksum_bits]
-        
-        # Combine entropy and checksum
-        entropy_bits = ''.join(bin(b)[2:].zfill(8) for b in entropy)
-        combined_bits = entropy_bits + checksum_bits
+        # Append the checksum bits to the entropy
+        checksum = hashlib.sha256(entropy).digest()[0] >> (8 - self.checksum_bits)
+        combined = (int.from_bytes(entropy, 'big') << self.checksum_bits) | checksum
         
-        # Convert bits to words
-        words = []
-        for i in range(0, len(combined_bits), 11):
-            index = int(combined_bits[i:i+11], 2)
-            words.append(self.wordlist[index])
-        
-        return ' '.join(words)
+        # Split into 11-bit word indices, most significant first
+        return ' '.join(
+            self.wordlist[(combined >> (11 * (self.word_count - 1 - i))) & 0x7FF]
+            for i in range(self.word_count)
+        )
 
     def _mnemonic_to_entropy(self, mnemonic: str) -> bytes:
         """Convert mnemonic phrase back to entropy."""
@@ -51,26 +57,22 @@ class Mnemonic:
         if len(words) != self.word_count:
             raise ValueError(f"Invalid mnemonic length. Expected {self.word_count} words.")
 
-        # Convert words to bits
-        word_to_index = {word: i for i, word in enumerate(self.wordlist)}
-        combined_bits = ''
+        # Accumulate the 11-bit word indices
+        word_to_index = Mnemonic._WORD_TO_INDEX
+        combined = 0
         for word in words:
-            if word not in word_to_index:
+            index = word_to_index.get(word)
+            if index is None:
                 raise ValueError(f"Invalid word in mnemonic: {word}")
-            index = word_to_index[word]
-            combined_bits += bin(index)[2:].zfill(11)
+            combined = (combined << 11) | index
 
         # Split entropy and checksum
-        entropy_bits = combined_bits[:-self.checksum_bits]
-        checksum_bits = combined_bits[-self.checksum_bits:]
-
-        # Convert entropy bits to bytes
-        entropy_bytes = bytes(int(entropy_bits[i:i+8], 2) for i in range(0, len(entropy_bits), 8))
+        checksum = combined & ((1 << self.checksum_bits) - 1)
+        entropy_bytes = (combined >> self.checksum_bits).to_bytes(self.entropy_bits // 8, 'big')
 
         # Verify checksum
-        checksum = hashlib.sha256(entropy_bytes).digest()[0]
-        expected_checksum = bin(checksum)[2:].zfill(8)[:self.checksum_bits]
-        if checksum_bits != expected_checksum:
+        expected_checksum = hashlib.sha256(entropy_bytes).digest()[0] >> (8 - self.checksum_bits)
+        if checksum != expected_checksum:
             raise ValueError("Invalid mnemonic checksum")
 
         return entropy_bytes
@@ -90,7 +92,9 @@ class Mnemonic:
 
     def to_seed(self, mnemonic: str, passphrase: str = "") -> bytes:
         """Convert mnemonic to seed using PBKDF2."""
-        if not self.validate(mnemonic):
+        try:
+            self._mnemonic_to_entropy(mnemonic)
+        except ValueError:
             raise ValueError("Invalid mnemonic phrase")
 
         # Normalize inputs
@@ -98,14 +102,15 @@ class Mnemonic:
         passphrase_bytes = passphrase.encode('utf-8')
         
         # Use PBKDF2 to derive the seed
-        seed = hashlib.pbkdf2_hmac(
-            'sha512',
-            mnemonic_bytes,
-            b'mnemonic' + passphrase_bytes,
-            2048  # Number of iterations
+        kdf = PBKDF2HMAC(
+            algorithm=hashes.SHA512(),
+            length=64,
+            salt=b'mnemonic' + passphrase_bytes,
+            iterations=2048,
+            backend=default_backend()
         )
         
-        return seed
+        return kdf.derive(mnemonic_bytes)
 
     def to_hex(self, mnemonic: str) -> str:
         """Convert mnemonic to hex string."""
@@ -2,13 +2,21 @@ import hashlib
 import time
 import asyncio
 import random
-from typing import Dict, List, Set, Optional, Tuple
-from dataclasses import dataclass
+import heapq
+from typing import Dict, List, Set, Optional, Tuple, Union
+from dataclasses import dataclass, field
 from datetime import datetime
 import logging
 from ..storage import ChainStorage
 
-@dataclass
+ID_BITS = 160  # Size of the Kademlia keyspace
+ID_BYTES = ID_BITS // 8
+
+def _id_bytes(node_id: str) -> bytes:
+    """Map a hex node ID onto the 160-bit keyspace."""
+    return bytes.fromhex(node_id)[:ID_BYTES]
+
+@dataclass(eq=False)
 class DHTNode:
     node_id: str
     host: str
@@ -17,58 +25,73 @@ class DHTNode:
     version: str = "1.0.0"
     height: int = 0
     is_active: bool = True
+    bucket_index: Optional[int] = field(default=None, repr=False)
+    node_id_int: int = field(init=False, repr=False)
+
+    def __post_init__(self):
+        self.node_id_int = int.from_bytes(_id_bytes(self.node_id), 'big')
 
 class KademliaDHT:
     def __init__(self, node_id: str, host: str, port: int, k: int = 20, alpha: int = 3):
         self.node_id = node_id
+        self.node_id_bytes = _id_bytes(node_id)
+        self.node_id_int = int.from_bytes(self.node_id_bytes, 'big')
         self.host = host
         self.port = port
         self.k = k  # Number of nodes in each k-bucket
         self.alpha = alpha  # Number of parallel requests
-        self.routing_table: Dict[int, Set[DHTNode]] = {i: set() for i in range(160)}  # 160-bit keyspace
+        self.routing_table: List[Dict[int, DHTNode]] = [{} for _ in range(ID_BITS)]  # Keyed by node_id_int
+        self._nonempty_buckets: Set[int] = set()
         self.peer_store: Dict[str, List[DHTNode]] = {}
-        self.lock = asyncio.Lock()
+        self.peer_heap: List[Tuple[float, int, DHTNode]] = []  # (last_seen, seq, peer) expiry queue
+        self._peer_seq = 0
+        self.bucket_locks = [asyncio.Lock() for _ in range(ID_BITS)]
+        self.peer_store_lock = asyncio.Lock()
         self.logger = logging.getLogger("KademliaDHT")
-        
-        # Initialize logging
-        logging.basicConfig(
-            level=logging.INFO,
-            format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-        )
 
-    def _get_bucket_index(self, node_id: str) -> int:
-        """Calculate the k-bucket index for a node ID."""
+    def _get_bucket_index(self, node: Union[DHTNode, str]) -> int:
+        """Calculate the k-bucket index for a node or a hex node ID."""
+        if isinstance(node, DHTNode):
+            if node.bucket_index is None:
+                node.bucket_index = self._bucket_for_int(node.node_id_int)
+            return node.bucket_index
+        return self._bucket_for_int(int.from_bytes(_id_bytes(node), 'big'))
+
+    def _bucket_for_int(self, node_id_int: int) -> int:
+        """Calculate the k-bucket index for an integer node ID."""
         # XOR the node IDs and find the first differing bit
-        xor = int(self.node_id, 16) ^ int(node_id, 16)
+        xor = self.node_id_int ^ node_id_int
         if xor == 0:
-            return 159
-        return 159 - (xor.bit_length() - 1)
+            return ID_BITS - 1
+        return ID_BITS - xor.bit_length()
 
     async def add_node(self, node: DHTNode) -> None:
         """Add a node to the routing table."""
-        async with self.lock:
-            bucket_index = self._get_bucket_index(node.node_id)
+        bucket_index = self._get_bucket_index(node)
+        async with self.bucket_locks[bucket_index]:
             bucket = self.routing_table[bucket_index]
+            existing = bucket.get(node.node_id_int)
             
-            if node in bucket:
+            if existing is not None:
                 # Update last seen time
-                node.last_seen = time.time()
+                existing.last_seen = time.time()
                 return
             
             if len(bucket) < self.k:
-                bucket.add(node)
+                bucket[node.node_id_int] = node
+                self._nonempty_buckets.add(bucket_index)
             else:
                 # Check for inactive nodes
-                inactive_nodes = {n for n in bucket if not n.is_active}
-                if inactive_nodes:
-                    bucket.remove(inactive_nodes.pop())
-                    bucket.add(node)
+                inactive = next((i for i, n in bucket.items() if not n.is_active), None)
+                if inactive is not None:
+                    del bucket[inactive]
+                    bucket[node.node_id_int] = node
                 else:
                     # Ping the least recently seen node
-                    oldest_node = min(bucket, key=lambda n: n.last_seen)
-                    if not await self._ping_node(oldest_node):
-                        bucket.remove(oldest_node)
-                        bucket.add(node)
+                    oldest = min(bucket.values(), key=lambda n: n.last_seen)
+                    if not await self._ping_node(oldest):
+                        bucket.pop(oldest.node_id_int, None)
+                        bucket[node.node_id_int] = node
 
     async def _ping_node(self, node: DHTNode) -> bool:
         """Ping a node to check if it's still active."""
@@ -80,53 +103,86 @@ class KademliaDHT:
             self.logger.error(f"Error pinging node {node.node_id}: {str(e)}")
             return False
 
+    def _min_distance(self, bucket_index: int, target_bucket: int) -> int:
+        """Lower bound on the XOR distance from a target to any node in a bucket."""
+        if bucket_index == target_bucket:
+            return 0
+        # Nodes closer to us than the target share its top differing bit
+        return 1 << (ID_BITS - 1 - min(bucket_index, target_bucket))
+
     async def find_node(self, target_id: str) -> List[DHTNode]:
         """Find the k closest nodes to the target ID."""
-        async with self.lock:
-            bucket_index = self._get_bucket_index(target_id)
-            closest_nodes = set()
-            
-            # Get nodes from the target bucket
-            closest_nodes.update(self.routing_table[bucket_index])
-            
-            # Get nodes from adjacent buckets if needed
-            for i in range(1, 160):
-                if len(closest_nodes) >= self.k:
-                    break
-                    
-                # Check buckets above and below
-                if bucket_index + i < 160:
-                    closest_nodes.update(self.routing_table[bucket_index + i])
-                if bucket_index - i >= 0:
-                    closest_nodes.update(self.routing_table[bucket_index - i])
+        # Runs without awaiting, so buckets can't change underneath the scan
+        target_int = int.from_bytes(_id_bytes(target_id), 'big')
+        target_bucket = self._bucket_for_int(target_int)
+        bucket_order = sorted(
+            self._nonempty_buckets,
+            key=lambda i: self._min_distance(i, target_bucket)
+        )
+        
+        # Max-heap (negated distance) of the k best candidates so far
+        closest: List[Tuple[int, int, DHTNode]] = []
+        for bucket_index in bucket_order:
+            # Stop once no remaining bucket can hold a closer node
+            if len(closest) >= self.k and -closest[0][0] < self._min_distance(bucket_index, target_bucket):
+                break
             
-            return sorted(
-                closest_nodes,
-                key=lambda n: int(n.node_id, 16) ^ int(target_id, 16)
-            )[:self.k]
+            for node_int, node in self.routing_table[bucket_index].items():
+                entry = (-(node_int ^ target_int), node_int, node)
+                if len(closest) < self.k:
+                    heapq.heappush(closest, entry)
+                elif entry > closest[0]:
+                    heapq.heapreplace(closest, entry)
+        
+        return [node for _, _, node in sorted(closest, reverse=True)]
 
     async def store_peer(self, peer: DHTNode) -> None:
         """Store a peer in the DHT."""
-        async with self.lock:
+        async with self.peer_store_lock:
             if peer.node_id not in self.peer_store:
                 self.peer_store[peer.node_id] = []
             self.peer_store[peer.node_id].append(peer)
+            self._peer_seq += 1
+            heapq.heappush(self.peer_heap, (peer.last_seen, self._peer_seq, peer))
 
     async def get_peers(self, target_id: str) -> List[DHTNode]:
         """Get peers associated with a target ID."""
-        async with self.lock:
+        async with self.peer_store_lock:
             return self.peer_store.get(target_id, [])
 
     async def remove_inactive_nodes(self) -> None:
         """Remove inactive nodes from the routing table."""
-        async with self.lock:
-            current_time = time.time()
-            for bucket in self.routing_table.values():
-                inactive_nodes = {
-                    node for node in bucket
+        current_time = time.time()
+        for bucket_index in list(self._nonempty_buckets):
+            async with self.bucket_locks[bucket_index]:
+                bucket = self.routing_table[bucket_index]
+                inactive_nodes = [
+                    node_int for node_int, node in bucket.items()
                     if current_time - node.last_seen > 3600  # 1 hour
-                }
-                bucket.difference_update(inactive_nodes)
+                ]
+                for node_int in inactive_nodes:
+                    del bucket[node_int]
+                if not bucket:
+                    self._nonempty_buckets.discard(bucket_index)
+
+    async def remove_expired_peers(self) -> None:
+        """Remove peers not seen for an hour from the peer store."""
+        async with self.peer_store_lock:
+            cutoff = time.time() - 3600  # 1 hour
+            while self.peer_heap and self.peer_heap[0][0] < cutoff:
+                _, _, peer = heapq.heappop(self.peer_heap)
+                if peer.last_seen >= cutoff:
+                    # Seen again since it was queued; requeue at its new time
+                    self._peer_seq += 1
+                    heapq.heappush(self.peer_heap, (peer.last_seen, self._peer_seq, peer))
+                    continue
+                
+                peers = self.peer_store.get(peer.node_id)
+                if peers is None:
+                    continue
+                peers[:] = [p for p in peers if p is not peer]
+                if not peers:
+                    del self.peer_store[peer.node_id]
 
     async def start(self) -> None:
         """Start the DHT node."""
@@ -143,18 +199,12 @@ class KademliaDHT:
     async def _maintain_peer_store(self) -> None:
         """Maintain the peer store by removing inactive peers."""
         while True:
-            async with self.lock:
-                current_time = time.time()
-                for node_id, peers in self.peer_store.items():
-                    self.peer_store[node_id] = [
-                        peer for peer in peers
-                        if current_time - peer.last_seen <= 3600
-                    ]
+            await self.remove_expired_peers()
             await asyncio.sleep(300)  # Check every 5 minutes
 
     def get_routing_table_size(self) -> int:
         """Get the total number of nodes in the routing table."""
-        return sum(len(bucket) for bucket in self.routing_table.values())
+        return sum(len(bucket) for bucket in self.routing_table)
 
     def get_peer_store_size(self) -> int:
         """Get the total number of peers in the peer store."""
@@ -162,6 +212,10 @@ class KademliaDHT:
 
 async def main():
     # Example usage
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    )
     node_id = hashlib.sha256(b"test_node").hexdigest()
     dht = KademliaDHT(node_id, "127.0.0.1", 8333)
     await dht.start()
@@ -0,0 +1,43 @@
+import pytest
+import json
+import time
+from .chain_hash import canonical_block_bytes, block_digest, verify_chain_digests
+from ..blockchain.blockchain import Block, Transaction
+
+@pytest.fixture
+def chain():
+    tx = Transaction(sender="alice", recipient="bob", amount=1.5, timestamp=time.time())
+    blocks = [Block(0, time.time(), [], "0" * 64)]
+    for i in range(1, 4):
+        blocks.append(Block(i, time.time(), [tx], blocks[-1].hash(), nonce=i, merkle_root="ab" * 32))
+    # Round-trip through JSON like a chain fetched from a peer
+    return json.loads(json.dumps([block.to_dict() for block in blocks]))
+
+def test_digest_matches_block_hash(chain):
+    """Test that peer-side hashing reproduces Block.hash byte for byte."""
+    for block in chain:
+        assert block_digest(block).hex() == block['hash']
+    assert canonical_block_bytes(chain[1]) == canonical_block_bytes(dict(chain[1], hash="ignored"))
+
+def test_verify_chain_digests(chain):
+    """Test chain checks against precomputed digests."""
+    digests = [block_digest(block) for block in chain[1:]]
+    assert verify_chain_digests(chain, digests)
+    assert verify_chain_digests([], [])
+    
+    # Tampered content no longer matches its stored hash
+    tampered = [dict(block) for block in chain]
+    tampered[2]['nonce'] = 99
+    assert not verify_chain_digests(tampered, [block_digest(block) for block in tampered[1:]])
+    
+    # A broken previous-hash link is rejected even when every hash is right
+    unlinked = [dict(block) for block in chain]
+    unlinked[2]['previous_hash'] = "00" * 32
+    unlinked[2]['hash'] = block_digest(unlinked[2]).hex()
+    assert not verify_chain_digests(unlinked, [block_digest(block) for block in unlinked[1:]])
+    
+    # Hashes that only match once joined are still rejected
+    split = [dict(block) for block in chain]
+    split[1]['hash'], split[2]['hash'] = split[1]['hash'][:-1], split[1]['hash'][-1] + split[2]['hash']
+    split[2]['previous_hash'] = split[1]['hash']
+    assert not verify_chain_digests(split, digests)
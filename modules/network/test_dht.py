@@ -85,6 +85,32 @@ async def test_inactive_node_removal(dht):
     # Check if node was removed
     assert dht.get_routing_table_size() == 0
 
+@pytest.mark.asyncio
+async def test_expired_peer_removal(dht):
+    """Test expiry of stale peers from the peer store."""
+    stale_peer = DHTNode(
+        node_id=hashlib.sha256(b"stale_peer").hexdigest(),
+        host="127.0.0.1",
+        port=8333,
+        last_seen=time.time() - 7200  # 2 hours ago
+    )
+    fresh_peer = DHTNode(
+        node_id=hashlib.sha256(b"fresh_peer").hexdigest(),
+        host="127.0.0.1",
+        port=8334,
+        last_seen=time.time()
+    )
+    await dht.store_peer(stale_peer)
+    await dht.store_peer(fresh_peer)
+    
+    # Run maintenance
+    await dht.remove_expired_peers()
+    
+    # Check only the stale peer was removed
+    assert await dht.get_peers(stale_peer.node_id) == []
+    assert len(await dht.get_peers(fresh_peer.node_id)) == 1
+    assert dht.get_peer_store_size() == 1
+
 @pytest.mark.asyncio
 async def test_concurrent_operations(dht):
     """Test concurrent DHT operations."""
@@ -121,7 +147,7 @@ async def test_bucket_management(dht):
         await dht.add_node(node)
     
     # Check bucket sizes
-    for bucket in dht.routing_table.values():
+    for bucket in dht.routing_table:
         assert len(bucket) <= dht.k
 
 def main():
@@ -1,8 +1,13 @@
 import pytest
 import asyncio
-import json
+import sys
+import time
 from datetime import datetime
-from .peer import PeerNetwork, Peer
+from types import SimpleNamespace
+from .peer import (
+    PeerNetwork, Peer, _encode, _decode, _send_frame, _read_frame,
+    _header_key, _typed_key, FRAME_HEADER_SIZE, MAX_MESSAGE_SIZE
+)
 from ..storage import ChainStorage
 
 @pytest.fixture
@@ -27,12 +32,10 @@ async def test_peer_handshake(network):
         'version': '1.0.0',
         'height': 0
     }
-    writer.write(json.dumps(handshake).encode())
-    await writer.drain()
+    await _send_frame(writer, handshake)
     
     # Read response
-    data = await reader.read(1024)
-    response = json.loads(data.decode())
+    response = await _read_frame(reader)
     
     assert response['type'] == 'handshake_ack'
     assert response['version'] == '1.0.0'
@@ -86,6 +89,109 @@ async def test_block_sync(network):
     network.running = False
     await network_task
 
+def test_decode_limits():
+    """Test that oversized containers are rejected before decoding."""
+    assert _decode(_encode({'items': list(range(100))})) == {'items': list(range(100))}
+    with pytest.raises(ValueError):
+        _decode(_encode(list(range(20000))))
+    with pytest.raises(ValueError):
+        _decode(_encode({str(i): i for i in range(300)}))
+
+def test_header_key_covers_hashed_fields():
+    """Test that the verified-block memo key changes with every field the hash commits to."""
+    block = {
+        'index': 1, 'timestamp': 1, 'transactions': [], 'previous_hash': '0' * 64,
+        'hash': 'f' * 64, 'difficulty': 4, 'merkle_root': 'a' * 64, 'nonce': 7
+    }
+    key = _header_key(block)
+    for field, value in [('index', 999), ('timestamp', 2), ('difficulty', 0), ('nonce', 8),
+                         ('previous_hash', '1' * 64), ('merkle_root', 'b' * 64)]:
+        assert _header_key({**block, field: value}) != key
+
+def test_block_with_swapped_transactions_rejected(tmp_path, monkeypatch):
+    """Test that a valid header cannot carry transactions its merkle root does not commit to."""
+    monkeypatch.chdir(tmp_path)
+    network = PeerNetwork(None)
+    miner = network.miner
+    transactions = [{'sender': 'a', 'recipient': 'b', 'amount': 1, 'timestamp': 1}]
+    block = {
+        'index': 1, 'timestamp': 1, 'transactions': transactions, 'previous_hash': '0' * 64,
+        'difficulty': 0, 'nonce': 0, 'merkle_root': miner._calculate_merkle_root(transactions)
+    }
+    block['hash'] = miner._calculate_block_hash(SimpleNamespace(**block))
+    assert network._verify_block(block)
+    
+    # Rejected on first sight and after the original filled the verified-block memo
+    swapped = {**block, 'transactions': [{**transactions[0], 'recipient': 'mallory', 'amount': 1000}]}
+    assert not network._verify_block(swapped)
+    assert not network._count_valid_prefix([swapped])
+
+def test_typed_key_separates_distinct_json():
+    """Test that digest cache keys tell apart values that compare equal but serialize differently."""
+    assert _typed_key({'amount': 1, 'tags': [0.5]}) == _typed_key({'amount': 1, 'tags': [0.5]})
+    for left, right in [(1, 1.0), (1, True), (0.0, -0.0), ([1], [1.0]), ({'a': 0}, {'a': False})]:
+        assert left == right
+        assert _typed_key(left) != _typed_key(right)
+
+@pytest.mark.asyncio
+async def test_read_frame():
+    """Test that frames are read whole and oversized frames are refused before their body."""
+    reader = asyncio.StreamReader()
+    body = _encode({'type': 'handshake', 'padding': 'x' * 4096})
+    reader.feed_data(len(body).to_bytes(FRAME_HEADER_SIZE, 'big') + body)
+    assert (await _read_frame(reader))['padding'] == 'x' * 4096
+    
+    reader.feed_data((MAX_MESSAGE_SIZE + 1).to_bytes(FRAME_HEADER_SIZE, 'big'))
+    with pytest.raises(ValueError):
+        await _read_frame(reader)
+    
+    # Unframed JSON from older peers is refused, not read as a 2 GB length
+    reader = asyncio.StreamReader()
+    reader.feed_data(b'{"type": "handshake"}')
+    with pytest.raises(ValueError, match="Unframed"):
+        await _read_frame(reader)
+
+class _CollectingWriter:
+    """Minimal stream writer that keeps everything written to it."""
+    def __init__(self):
+        self.data = bytearray()
+    
+    def writelines(self, chunks):
+        for chunk in chunks:
+            self.data += chunk
+    
+    async def drain(self):
+        pass
+
+@pytest.mark.asyncio
+async def test_get_blocks_clamped_and_paged(tmp_path, monkeypatch):
+    """Test that get_blocks replies are clamped to the stored range, capped and loaded in pages."""
+    monkeypatch.chdir(tmp_path)
+    peer_module = sys.modules[PeerNetwork.__module__]
+    monkeypatch.setattr(peer_module, 'MAX_BLOCKS_PER_REQUEST', 5)
+    monkeypatch.setattr(peer_module, 'BLOCK_STREAM_PAGE', 2)
+    network = PeerNetwork(None)
+    network.storage.save_blocks([{'hash': f'hash_{i}', 'index': i, 'transactions': []} for i in range(8)])
+    network.miner.height = 7
+    
+    pages = []
+    load_range = network.storage.load_blocks_by_height_range
+    def record_page(low, high):
+        pages.append((low, high))
+        return load_range(low, high)
+    monkeypatch.setattr(network.storage, 'load_blocks_by_height_range', record_page)
+    
+    writer = _CollectingWriter()
+    await network._handle_get_blocks(writer, {'type': 'get_blocks', 'start_height': -3, 'end_height': 100})
+    
+    reader = asyncio.StreamReader()
+    reader.feed_data(bytes(writer.data))
+    reader.feed_eof()
+    header = await _read_frame(reader)
+    assert header == {'type': 'blocks_stream', 'count': 5}
+    assert [(await _read_frame(reader))['index'] for _ in range(5)] == [0, 1, 2, 3, 4]
+    assert pages == [(0, 1), (2, 3), (4, 4)]
+
 @pytest.mark.asyncio
 async def test_transaction_broadcast(network):
     """Test transaction broadcasting."""
@@ -162,6 +268,11 @@ async def test_transaction_verification(network):
     
     assert network._verify_transaction(valid_transaction)
     assert not network._verify_transaction(invalid_transaction)
+    
+    # Epoch timestamps are checked for age and clock skew
+    assert network._verify_transaction({**valid_transaction, 'timestamp': time.time()})
+    assert not network._verify_transaction({**valid_transaction, 'timestamp': time.time() - 7200})
+    assert not network._verify_transaction({**valid_transaction, 'timestamp': time.time() + 3600})
 
 @pytest.mark.asyncio
 async def test_peer_maintenance(network):
@@ -170,17 +281,17 @@ async def test_peer_maintenance(network):
     peer1 = Peer(host='127.0.0.1', port=8335, last_seen=time.time())
     peer2 = Peer(host='127.0.0.1', port=8336, last_seen=time.time() - 7200)  # 2 hours ago
     
-    with network.lock:
-        network.peers.add(peer1)
-        network.peers.add(peer2)
+    async with network.lock:
+        network.peers[(peer1.host, peer1.port)] = peer1
+        network.peers[(peer2.host, peer2.port)] = peer2
     
     # Run maintenance
     await network._maintain_peers()
     
     # Check if inactive peer was removed
-    with network.lock:
-        assert peer1 in network.peers
-        assert peer2 not in network.peers
+    async with network.lock:
+        assert (peer1.host, peer1.port) in network.peers
+        assert (peer2.host, peer2.port) not in network.peers
 
 @pytest.mark.asyncio
 async def test_concurrent_peer_operations(network):
@@ -203,8 +314,7 @@ async def test_concurrent_peer_operations(network):
             'version': '1.0.0',
             'height': i
         }
-        writer.write(json.dumps(handshake).encode())
-        await writer.drain()
+        await _send_frame(writer, handshake)
     
     # Wait for processing
     await asyncio.sleep(2)
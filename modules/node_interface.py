@@ -4,13 +4,41 @@ Node Interface Module for direct communication between wallet and node backend.
 This module provides direct function calls when running on the same machine.
 """
 
+import copy
 import os
 import sys
 import json
 import logging
+from pathlib import Path
 from typing import Dict, Any, Optional, List
 from modules.utils.print_utils import print_info, print_error, print_success
 
+# orjson parses the config straight from bytes; fall back to json without it
+try:
+    import orjson
+    _json_loads = orjson.loads
+except ImportError:
+    _json_loads = json.loads
+
+CONFIG_PATH = Path('node.conf')
+
+# Used when node.conf does not exist
+_DEFAULT_CONFIG: Dict[str, Any] = {
+    "node": {
+        "host": "localhost",
+        "port": 9999,
+        "peers": []
+    },
+    "blockchain": {
+        "difficulty": 4,
+        "mining_reward": 50,
+        "block_time": 60
+    },
+    "wallet": {
+        "storage_path": "chain/wallets/"
+    }
+}
+
 # Add the parent directory to the Python path to import node components
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
@@ -27,6 +55,8 @@ except ImportError as e:
 class NodeInterface:
     """Interface for direct communication with node backend components."""
     
+    _config: Optional[Dict[str, Any]] = None  # Parsed once per process, shared by all instances
+    
     def __init__(self):
         self.blockchain = None
         self.peer_network = None
@@ -66,31 +96,21 @@ class NodeInterface:
             return False
     
     def _load_config(self) -> Dict[str, Any]:
-        """Load node configuration."""
-        try:
-            if os.path.exists('node.conf'):
-                with open('node.conf', 'r') as f:
-                    return json.load(f)
-            else:
-                # Return default config
-                return {
-                    "node": {
-                        "host": "localhost",
-                        "port": 9999,
-                        "peers": []
-                    },
-                    "blockchain": {
-                        "difficulty": 4,
-                        "mining_reward": 50,
-                        "block_time": 60
-                    },
-                    "wallet": {
-                        "storage_path": "chain/wallets/"
-                    }
-                }
-        except Exception as e:
-            print_error(f"Failed to load config: {e}")
-            return {}
+        """Load node configuration, parsing node.conf only on first use.
+
+        Each call returns its own copy, so callers cannot alter the shared config.
+        """
+        config = NodeInterface._config
+        if config is None:
+            try:
+                config = NodeInterface._config = _json_loads(CONFIG_PATH.read_bytes())
+            except FileNotFoundError:
+                config = NodeInterface._config = _DEFAULT_CONFIG
+            except Exception as e:
+                # Not cached, so a fixed file is picked up on the next initialize
+                print_error(f"Failed to load config: {e}")
+                config = _DEFAULT_CONFIG
+        return copy.deepcopy(config)
     
     def get_status(self) -> Dict[str, Any]:
         """Get node status."""
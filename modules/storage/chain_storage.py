@@ -1,20 +1,63 @@
 import json
 import os
+import struct
+import msgpack
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime
 import shutil
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from ..encryption import Encryption
 from modules.utils.print_utils import print_success, print_error, print_warning, print_info
 
+# Blocks and chain state are msgpack records encrypted as raw bytes; files written
+# before this format used a JSON envelope and are rewritten on first start.
+RECORD_SUFFIX = ".mp"
+RECORD_HEADER = struct.Struct('>BI')  # Format version and ciphertext length before each record
+FERNET_RECORD_VERSION = 1  # Binary Fernet token; still read, no longer written
+RECORD_VERSION = 2  # AES-GCM nonce, ciphertext and tag
+LEGACY_SUFFIX = ".json"
+BLOCK_CACHE_SIZE = 4096  # Decoded blocks kept in memory by load_block
+LOAD_CHAIN_WORKERS = min(32, (os.cpu_count() or 1) * 4)  # Threads overlapping file reads in load_chain
+
+def _block_file_name(index: int, block_hash: str) -> str:
+    """Name a block file by height and hash, so sorted names are in chain order."""
+    return f"{index:012d}-{block_hash}{RECORD_SUFFIX}"
+
+def _atomic_write(path: Path, data: bytes, durable: bool = False):
+    """Write a file through a temporary sibling and os.replace, so readers never see it half written."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, 'wb') as f:
+        f.write(data)
+        if durable:
+            f.flush()
+            os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def _link_or_copy(src: str, dst: str) -> str:
+    """Hard-link a block file, copying instead where links are unsupported or cross devices."""
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    return dst
+
 class ChainStorage:
     def __init__(self, chain_dir: str = "chain"):
         self.chain_dir = Path(chain_dir)
         self.blocks_dir = self.chain_dir / "blocks"
         self.wallets_dir = self.chain_dir / "wallets"
-        self.state_file = self.chain_dir / "state.json"
+        self.state_file = self.chain_dir / f"state{RECORD_SUFFIX}"
         self.encryption = Encryption(str(self.chain_dir / "keys" / "master.key"))
+        self._block_files: Optional[Dict[str, str]] = None  # Block hash -> file name, built from one directory scan
+        self._height_index: Optional[Dict[int, str]] = None  # Block height -> hash, built with _block_files
+        self._block_cache: OrderedDict = OrderedDict()  # Block hash -> decoded block, least recent first
+        self._block_cache_lock = threading.Lock()  # Loads run on worker threads
+        self._state_cache: Optional[Tuple[Tuple[int, int, int], bytes]] = None  # (file stat key, decrypted state)
         self._initialize_directories()
+        self._migrate_legacy_files()
 
     def _initialize_directories(self):
         """Create necessary directories if they don't exist."""
@@ -22,50 +65,217 @@ class ChainStorage:
         self.blocks_dir.mkdir(exist_ok=True)
         self.wallets_dir.mkdir(exist_ok=True)
 
+    def _encode_record(self, record: Dict[str, Any]) -> bytes:
+        """Serialize a block or state record with msgpack and encrypt it behind a binary header."""
+        return self._encrypt_record(msgpack.packb(record, use_bin_type=True))
+
+    def _encrypt_record(self, plaintext: bytes) -> bytes:
+        """Encrypt serialized record bytes behind a binary header."""
+        ciphertext = self.encryption.encrypt_aead(plaintext)
+        return RECORD_HEADER.pack(RECORD_VERSION, len(ciphertext)) + ciphertext
+
+    def _decode_record(self, data: bytes) -> Dict[str, Any]:
+        """Decrypt and deserialize a record written by _encode_record."""
+        return msgpack.unpackb(self._decrypt_record(data), raw=False)
+
+    def _decrypt_record(self, data: bytes) -> bytes:
+        """Decrypt a record file's contents back to its serialized bytes."""
+        if data[:1] not in (bytes((RECORD_VERSION,)), bytes((FERNET_RECORD_VERSION,))):
+            # Unframed base64 token from before the binary header
+            return self.encryption.fernet.decrypt(data)
+        version, length = RECORD_HEADER.unpack_from(data)
+        ciphertext = memoryview(data)[RECORD_HEADER.size:]
+        if len(ciphertext) != length:
+            raise ValueError(f"Record truncated: expected {length} bytes, found {len(ciphertext)}")
+        if version == RECORD_VERSION:
+            return self.encryption.decrypt_aead(ciphertext)
+        return self.encryption.decrypt_symmetric_bytes(ciphertext)
+
+    def _read_legacy_record(self, path: Path) -> Dict[str, Any]:
+        """Read a record saved in the old JSON envelope format."""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        return json.loads(self.encryption.decrypt_symmetric(data['encrypted_data']))
+
+    def _migrate_legacy_files(self):
+        """Rewrite blocks and state saved in the old JSON format as msgpack records."""
+        legacy_state = self.chain_dir / f"state{LEGACY_SUFFIX}"
+        if legacy_state.exists():
+            try:
+                if not self.state_file.exists():
+                    self.save_chain_state(self._read_legacy_record(legacy_state))
+                legacy_state.unlink()
+            except Exception as e:
+                print_error(f"Failed to migrate chain state: {e}")
+        
+        # JSON files, and msgpack files named by hash alone before heights were added
+        with os.scandir(self.blocks_dir) as entries:
+            legacy_files = [
+                Path(entry.path) for entry in entries
+                if entry.name.endswith(LEGACY_SUFFIX) or (entry.name.endswith(RECORD_SUFFIX) and '-' not in entry.name)
+            ]
+        if not legacy_files:
+            return
+        print_info(f"Migrating {len(legacy_files)} block files to the current format")
+        for legacy_file in legacy_files:
+            try:
+                if legacy_file.suffix == LEGACY_SUFFIX:
+                    block = self._read_legacy_record(legacy_file)
+                else:
+                    block = self._decode_record(legacy_file.read_bytes())
+                self._write_block(block)
+                legacy_file.unlink()
+            except Exception as e:
+                print_error(f"Failed to migrate block file {legacy_file.name}: {e}")
+
+    def _scan_block_files(self) -> Dict[str, str]:
+        """Index block files by hash and height from their names, without reading them."""
+        block_files: Dict[str, str] = {}
+        height_index: Dict[int, str] = {}
+        with os.scandir(self.blocks_dir) as entries:
+            for entry in entries:
+                name = entry.name
+                if not name.endswith(RECORD_SUFFIX):
+                    continue
+                index, sep, block_hash = name[:-len(RECORD_SUFFIX)].partition('-')
+                if not sep or not index.isdigit():
+                    continue
+                block_files[block_hash] = name
+                height_index[int(index)] = block_hash
+        self._block_files = block_files
+        self._height_index = height_index
+        return block_files
+
+    def _get_block_files(self) -> Dict[str, str]:
+        """Get the hash -> file name index, scanning the blocks directory on first use."""
+        block_files = self._block_files
+        if block_files is None:
+            block_files = self._scan_block_files()
+        return block_files
+
     def save_block(self, block: Dict[str, Any]) -> str:
         """Save a block to disk with encryption."""
-        block_hash = block['hash']
-        block_file = self.blocks_dir / f"{block_hash}.json"
-        
         # Add timestamp for when the block was saved
         block['saved_at'] = datetime.utcnow().isoformat()
+        return self._write_block(block)
+
+    def save_blocks(self, blocks: List[Dict[str, Any]]) -> List[str]:
+        """Save a batch of blocks in order, stamping them with one saved_at time."""
+        saved_at = datetime.utcnow().isoformat()
+        block_hashes = []
+        for block in blocks:
+            block['saved_at'] = saved_at
+            block_hashes.append(self._write_block(block))
+        return block_hashes
+
+    def _write_block(self, block: Dict[str, Any]) -> str:
+        """Encrypt a block and write it to its file."""
+        block_hash = block['hash']
+        index = block['index']
+        file_name = _block_file_name(index, block_hash)
+        block_files = self._get_block_files()
         
-        # Encrypt block data
-        encrypted_data = self.encryption.encrypt_symmetric(json.dumps(block))
-        
-        with open(block_file, 'w') as f:
-            json.dump({'encrypted_data': encrypted_data}, f, indent=4)
+        # Replace rather than overwrite, so hard-linked backups keep their own copy
+        _atomic_write(self.blocks_dir / file_name, self._encode_record(block))
+        with self._block_cache_lock:
+            self._block_cache.pop(block_hash, None)
         
+        # A block rewritten at another height replaces its old file
+        previous = block_files.get(block_hash)
+        if previous is not None and previous != file_name:
+            (self.blocks_dir / previous).unlink(missing_ok=True)
+            previous_index = int(previous.partition('-')[0])
+            if self._height_index.get(previous_index) == block_hash:
+                del self._height_index[previous_index]
+        block_files[block_hash] = file_name
+        self._height_index[index] = block_hash
         return block_hash
 
     def load_block(self, block_hash: str) -> Optional[Dict[str, Any]]:
-        """Load a block from disk with decryption."""
-        block_file = self.blocks_dir / f"{block_hash}.json"
-        if not block_file.exists():
-            return None
+        """Load a block from disk with decryption.
+
+        Recently loaded blocks are served from memory; callers must not modify
+        the returned dict.
+        """
+        with self._block_cache_lock:
+            block = self._block_cache.get(block_hash)
+            if block is not None:
+                self._block_cache.move_to_end(block_hash)
+                return block
         
-        with open(block_file, 'r') as f:
-            data = json.load(f)
-            encrypted_data = data['encrypted_data']
-            decrypted_data = self.encryption.decrypt_symmetric(encrypted_data)
-            return json.loads(decrypted_data)
+        data = self._read_block_file(self._get_block_files().get(block_hash))
+        if data is None:
+            # Other ChainStorage instances on this directory may have added or moved it since our scan
+            data = self._read_block_file(self._scan_block_files().get(block_hash))
+            if data is None:
+                return None
+        block = self._decode_record(data)
+        
+        with self._block_cache_lock:
+            self._block_cache[block_hash] = block
+            if len(self._block_cache) > BLOCK_CACHE_SIZE:
+                self._block_cache.popitem(last=False)
+        return block
+
+    def _read_block_file(self, file_name: Optional[str]) -> Optional[bytes]:
+        """Read a block file by name, or return None if it is unknown or gone."""
+        if file_name is None:
+            return None
+        # Open directly rather than stat first; range loads call this once per block
+        try:
+            with open(self.blocks_dir / file_name, 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def _clear_block_cache(self):
+        """Forget cached blocks after files are removed or replaced in bulk."""
+        with self._block_cache_lock:
+            self._block_cache.clear()
+        self._block_files = None
+        self._height_index = None
+
+    def load_blocks_by_height_range(self, start_height: int, end_height: int) -> List[Optional[Dict[str, Any]]]:
+        """Load blocks for heights start_height..end_height inclusive, with None for missing heights."""
+        index = self._height_index
+        heights = range(start_height, end_height + 1)
+        if index is None or not all(height in index for height in heights):
+            # Fill gaps left by blocks that other ChainStorage instances wrote since our scan
+            self._scan_block_files()
+            index = self._height_index
+        return [
+            self.load_block(index[height]) if height in index else None
+            for height in heights
+        ]
 
     def save_chain_state(self, state: Dict[str, Any]):
         """Save the current chain state with encryption."""
-        encrypted_data = self.encryption.encrypt_symmetric(json.dumps(state))
-        with open(self.state_file, 'w') as f:
-            json.dump({'encrypted_data': encrypted_data}, f, indent=4)
+        plaintext = msgpack.packb(state, use_bin_type=True)
+        # A crash leaves either the old or the new state, never a truncated file
+        _atomic_write(self.state_file, self._encrypt_record(plaintext), durable=True)
+        self._state_cache = (self._state_file_key(os.stat(self.state_file)), plaintext)
 
     def load_chain_state(self) -> Optional[Dict[str, Any]]:
-        """Load the current chain state with decryption."""
-        if not self.state_file.exists():
+        """Load the current chain state with decryption.
+
+        The decrypted state is kept until the file changes, so repeat calls cost
+        one stat; each call still gets its own dict.
+        """
+        try:
+            key = self._state_file_key(os.stat(self.state_file))
+        except FileNotFoundError:
             return None
         
-        with open(self.state_file, 'r') as f:
-            data = json.load(f)
-            encrypted_data = data['encrypted_data']
-            decrypted_data = self.encryption.decrypt_symmetric(encrypted_data)
-            return json.loads(decrypted_data)
+        cached = self._state_cache
+        if cached is None or cached[0] != key:
+            with open(self.state_file, 'rb') as f:
+                cached = self._state_cache = (key, self._decrypt_record(f.read()))
+        return msgpack.unpackb(cached[1], raw=False)
+
+    @staticmethod
+    def _state_file_key(st: os.stat_result) -> Tuple[int, int, int]:
+        """Identify a version of the state file; other processes may rewrite it."""
+        return (st.st_mtime_ns, st.st_size, st.st_ino)
 
     def save_wallet(self, address: str, wallet_data: Dict[str, Any], password: Optional[str] = None):
         """Save wallet data with encryption."""
@@ -91,8 +301,8 @@ class ChainStorage:
         # Encrypt the entire wallet data
         encrypted_data = self.encryption.encrypt_symmetric(json.dumps(data_to_save))
         
-        with open(wallet_file, 'w') as f:
-            json.dump({'encrypted_data': encrypted_data}, f, indent=4)
+        envelope = json.dumps({'encrypted_data': encrypted_data}, separators=(',', ':'))
+        _atomic_write(wallet_file, envelope.encode('utf-8'), durable=True)
 
     def load_wallet(self, address: str, password: Optional[str] = None) -> Optional[Dict[str, Any]]:
         """Load wallet data with decryption."""
@@ -138,9 +348,9 @@ class ChainStorage:
         return state.get('height', 0) if state else 0
 
     def backup_chain(self, backup_name: str):
-        """Create a backup of the entire chain."""
+        """Create a backup of the entire chain, hard-linking block files instead of copying them."""
         backup_dir = self.chain_dir.parent / f"chain_backup_{backup_name}"
-        shutil.copytree(self.chain_dir, backup_dir)
+        self._copy_chain_dir(self.chain_dir, backup_dir)
 
     def restore_chain(self, backup_name: str):
         """Restore chain from a backup."""
@@ -152,7 +362,18 @@ class ChainStorage:
         shutil.rmtree(self.chain_dir)
         
         # Restore from backup
-        shutil.copytree(backup_dir, self.chain_dir)
+        self._copy_chain_dir(backup_dir, self.chain_dir)
+        self._clear_block_cache()
+
+    def _copy_chain_dir(self, src: Path, dst: Path):
+        """Copy a chain directory, sharing block files through hard links.
+
+        Block files are never modified in place, so a link is as good as a copy;
+        state, keys and wallets are rewritten in place and are copied.
+        """
+        blocks_name = self.blocks_dir.name
+        shutil.copytree(src, dst, ignore=lambda directory, names: [blocks_name] if Path(directory) == src else [])
+        shutil.copytree(src / blocks_name, dst / blocks_name, copy_function=_link_or_copy)
 
     def cleanup_old_blocks(self, keep_last_n: int = 1000):
         """Remove old blocks while keeping the most recent ones."""
@@ -164,12 +385,13 @@ class ChainStorage:
         if current_height <= keep_last_n:
             return
         
-        # Get all block files
-        block_files = sorted(self.blocks_dir.glob("*.json"))
+        # Get all block files; names start with the height, so sorting puts the oldest first
+        block_files = sorted(self._scan_block_files().values())
         
         # Keep only the most recent blocks
-        for block_file in block_files[:-keep_last_n]:
-            block_file.unlink()
+        for file_name in block_files[:-keep_last_n]:
+            os.unlink(self.blocks_dir / file_name)
+        self._clear_block_cache()
 
     def load_chain(self) -> list:
         """Load the entire blockchain from disk, sorted by block index."""
@@ -180,33 +402,34 @@ class ChainStorage:
                 return blocks
                 
             print_info(f"Scanning blocks directory: {self.blocks_dir}")
-            block_files = list(self.blocks_dir.glob("*.json"))
+            # File names sort in chain order, so no block needs decoding to be placed
+            block_files = [
+                os.path.join(self.blocks_dir, file_name)
+                for file_name in sorted(self._scan_block_files().values())
+            ]
             print_info(f"Found {len(block_files)} block files")
             
-            for block_file in block_files:
-                try:
-                    print_info(f"Loading block file: {block_file.name}")
-                    with open(block_file, "r") as f:
-                        data = json.load(f)
-                        encrypted_data = data['encrypted_data']
-                        decrypted_data = self.encryption.decrypt_symmetric(encrypted_data)
-                        block = json.loads(decrypted_data)
-                        blocks.append(block)
-                        print_info(f"Successfully loaded block {block.get('index', 'unknown')}")
-                except Exception as e:
-                    print_error(f"Failed to load block file {block_file.name}: {e}")
-                    # Continue loading other blocks
-                    continue
+            # Reads overlap across threads; files that fail to load come back as None
+            with ThreadPoolExecutor(max_workers=LOAD_CHAIN_WORKERS) as executor:
+                blocks = [block for block in executor.map(self._load_block_file, block_files) if block is not None]
                     
-            sorted_blocks = sorted(blocks, key=lambda x: x['index'])
-            print_info(f"Successfully loaded {len(sorted_blocks)} blocks")
-            return sorted_blocks
+            print_info(f"Successfully loaded {len(blocks)} blocks")
+            return blocks
         except Exception as e:
             print_error(f"Error in load_chain: {e}")
             import traceback
             print_error(f"Traceback: {traceback.format_exc()}")
             return blocks
 
+    def _load_block_file(self, block_path: str) -> Optional[Dict[str, Any]]:
+        """Read and decode one block file for load_chain, or None if it cannot be loaded."""
+        try:
+            with open(block_path, "rb") as f:
+                return self._decode_record(f.read())
+        except Exception as e:
+            print_error(f"Failed to load block file {os.path.basename(block_path)}: {e}")
+            return None
+
 def main():
     # Example usage
     storage = ChainStorage()
@@ -1,6 +1,7 @@
 import pytest
 import json
 import shutil
+import msgpack
 from pathlib import Path
 from datetime import datetime
 from .chain_storage import ChainStorage
@@ -40,6 +41,89 @@ def test_save_and_load_block(storage):
     assert loaded_block['hash'] == block['hash']
     assert loaded_block['index'] == block['index']
     assert 'saved_at' in loaded_block
+    
+    # Files hold a version and length header followed by binary ciphertext
+    data = (storage.blocks_dir / "000000000001-test_hash.mp").read_bytes()
+    assert data[0] == 2
+    assert int.from_bytes(data[1:5], 'big') == len(data) - 5
+
+def test_load_block_cache(storage):
+    """Test that repeat loads are served from memory and rewrites are seen."""
+    storage.save_block({'hash': 'cached_hash', 'index': 1, 'transactions': []})
+    first = storage.load_block('cached_hash')
+    assert storage.load_block('cached_hash') is first
+    
+    storage.save_block({'hash': 'cached_hash', 'index': 2, 'transactions': []})
+    assert storage.load_block('cached_hash')['index'] == 2
+    assert [path.name for path in storage.blocks_dir.glob("*cached_hash.mp")] == ["000000000002-cached_hash.mp"]
+    assert storage.load_block('missing_hash') is None
+    
+    # Blocks another instance writes after our index is built are found too
+    other = ChainStorage(str(storage.chain_dir))
+    other.save_block({'hash': 'other_hash', 'index': 3, 'transactions': []})
+    assert storage.load_block('other_hash')['index'] == 3
+    
+    # And blocks it moves to another height
+    storage._clear_block_cache()
+    storage._get_block_files()
+    other.save_block({'hash': 'cached_hash', 'index': 5, 'transactions': []})
+    assert storage.load_block('cached_hash')['index'] == 5
+
+def test_save_blocks_batch(storage):
+    """Test saving a batch of blocks."""
+    blocks = [
+        {'hash': f'batch_hash_{i}', 'index': i, 'transactions': []}
+        for i in range(3)
+    ]
+    
+    assert storage.save_blocks(blocks) == ['batch_hash_0', 'batch_hash_1', 'batch_hash_2']
+    
+    loaded = [storage.load_block(f'batch_hash_{i}') for i in range(3)]
+    assert [block['index'] for block in loaded] == [0, 1, 2]
+    assert len({block['saved_at'] for block in loaded}) == 1
+
+def test_load_blocks_by_height_range(storage):
+    """Test loading a height range, including heights not yet stored."""
+    storage.save_blocks([
+        {'hash': f'range_hash_{i}', 'index': i, 'transactions': []}
+        for i in range(3)
+    ])
+    
+    loaded = storage.load_blocks_by_height_range(1, 3)
+    assert [block['hash'] for block in loaded[:2]] == ['range_hash_1', 'range_hash_2']
+    assert loaded[2] is None
+    
+    # Blocks saved after the index is built are found too
+    storage.save_block({'hash': 'range_hash_3', 'index': 3, 'transactions': []})
+    assert storage.load_blocks_by_height_range(3, 3)[0]['hash'] == 'range_hash_3'
+    
+    # Including those saved by another instance on the same directory
+    other = ChainStorage(str(storage.chain_dir))
+    other.save_block({'hash': 'range_hash_4', 'index': 4, 'transactions': []})
+    assert [block['hash'] for block in storage.load_blocks_by_height_range(3, 4)] == ['range_hash_3', 'range_hash_4']
+
+def test_migrate_legacy_files(storage):
+    """Test that blocks and state in older file formats are rewritten in the current one."""
+    encryption = storage.encryption
+    with open(storage.blocks_dir / "legacy_hash.json", 'w') as f:
+        json.dump({'encrypted_data': encryption.encrypt_symmetric(json.dumps({'hash': 'legacy_hash', 'index': 1}))}, f)
+    with open(storage.chain_dir / "state.json", 'w') as f:
+        json.dump({'encrypted_data': encryption.encrypt_symmetric(json.dumps({'height': 1}))}, f)
+    (storage.blocks_dir / "plain_hash.mp").write_bytes(storage._encode_record({'hash': 'plain_hash', 'index': 2}))
+    (storage.blocks_dir / "000000000003-token_hash.mp").write_bytes(
+        encryption.fernet.encrypt(msgpack.packb({'hash': 'token_hash', 'index': 3}))
+    )
+    fernet_token = encryption.encrypt_symmetric_bytes(msgpack.packb({'hash': 'fernet_hash', 'index': 4}))
+    (storage.blocks_dir / "000000000004-fernet_hash.mp").write_bytes(
+        b'\x01' + len(fernet_token).to_bytes(4, 'big') + fernet_token
+    )
+    
+    migrated = ChainStorage(str(storage.chain_dir))
+    assert migrated.load_block('legacy_hash')['index'] == 1
+    assert [block['hash'] for block in migrated.load_chain()] == ['legacy_hash', 'plain_hash', 'token_hash', 'fernet_hash']
+    assert migrated.load_chain_state() == {'height': 1}
+    assert not list(storage.blocks_dir.glob("*.json"))
+    assert not (storage.chain_dir / "state.json").exists()
 
 def test_save_and_load_chain_state(storage):
     """Test saving and loading chain state."""
@@ -59,6 +143,17 @@ def test_save_and_load_chain_state(storage):
     assert loaded_state['latest_block_hash'] == state['latest_block_hash']
     assert loaded_state['difficulty'] == state['difficulty']
 
+def test_chain_state_cache(storage):
+    """Test that cached state is refreshed when another writer replaces the file."""
+    storage.save_chain_state({'height': 1, 'pending_transactions': []})
+    loaded = storage.load_chain_state()
+    loaded['pending_transactions'].append({'amount': 1})
+    assert storage.load_chain_state() == {'height': 1, 'pending_transactions': []}
+    
+    other = ChainStorage(str(storage.chain_dir))
+    other.save_chain_state({'height': 2, 'pending_transactions': [{'amount': 2}]})
+    assert storage.load_chain_state()['height'] == 2
+
 def test_save_and_load_wallet(storage):
     """Test saving and loading wallet data."""
     wallet_data = {
@@ -98,8 +193,9 @@ def test_backup_and_restore(storage):
     backup_dir = storage.chain_dir.parent / f"chain_backup_{backup_name}"
     assert backup_dir.exists()
     
-    # Modify original data
+    # Modify original data, including a rewrite of a block the backup shares
     storage.save_block({'hash': 'new_hash', 'index': 2, 'transactions': []})
+    storage.save_block({'hash': 'test_hash', 'index': 1, 'transactions': [{'amount': 1}]})
     
     # Restore from backup
     storage.restore_chain(backup_name)
@@ -108,6 +204,8 @@ def test_backup_and_restore(storage):
     loaded_block = storage.load_block('test_hash')
     assert loaded_block is not None
     assert loaded_block['hash'] == 'test_hash'
+    assert loaded_block['transactions'] == []
+    assert storage.load_block('new_hash') is None
     
     # Cleanup backup
     shutil.rmtree(backup_dir)
@@ -131,17 +229,17 @@ def test_cleanup_old_blocks(storage):
     storage.cleanup_old_blocks(keep_last_n=3)
     
     # Verify only last 3 blocks remain
-    block_files = list(storage.blocks_dir.glob("*.json"))
+    block_files = list(storage.blocks_dir.glob("*.mp"))
     assert len(block_files) == 3
     
     # Verify oldest blocks are removed
-    assert not (storage.blocks_dir / "test_hash_0.json").exists()
-    assert not (storage.blocks_dir / "test_hash_1.json").exists()
+    assert not (storage.blocks_dir / "000000000000-test_hash_0.mp").exists()
+    assert not (storage.blocks_dir / "000000000001-test_hash_1.mp").exists()
     
     # Verify newest blocks remain
-    assert (storage.blocks_dir / "test_hash_2.json").exists()
-    assert (storage.blocks_dir / "test_hash_3.json").exists()
-    assert (storage.blocks_dir / "test_hash_4.json").exists()
+    assert (storage.blocks_dir / "000000000002-test_hash_2.mp").exists()
+    assert (storage.blocks_dir / "000000000003-test_hash_3.mp").exists()
+    assert (storage.blocks_dir / "000000000004-test_hash_4.mp").exists()
 
 def test_get_latest_block_hash(storage):
     """Test getting the latest block hash."""
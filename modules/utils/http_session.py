@@ -0,0 +1,22 @@
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+def create_session(pool_size: int = 32) -> requests.Session:
+    """Create a requests session that keeps connections alive between calls.
+
+    urllib3 already sets TCP_NODELAY on every connection it opens, so reusing
+    pooled sockets is what saves the handshake on repeated status checks.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=pool_size,
+        pool_maxsize=pool_size,
+        max_retries=Retry(total=2, backoff_factor=0.1)
+    )
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+# Shared by the node's synchronous status, peer-check and proxy requests
+http_session = create_session()
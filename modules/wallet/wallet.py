@@ -190,7 +190,7 @@ class WalletManager:
                 json.dump({
                     "wallets": self.wallets,
                     "timestamp": time.time()
-                }, f, indent=4)
+                }, f, separators=(",", ":"))
             
             print_success("Wallet state saved")
             return True
@@ -12,9 +12,10 @@ import requests
 from typing import List, Optional, Dict, Any
 from colorama import init, Fore, Style
 from modules.utils.print_utils import print_success, print_error, print_warning, print_info
+from modules.utils.http_session import http_session
 from datetime import datetime
 from fastapi import FastAPI, Request, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 
@@ -32,7 +33,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
 
 # Import modules
 from modules.sync.sync import CodeSync
-from modules.network.peer import PeerNetwork
+from modules.network.peer import PeerNetwork, MAX_BLOCKS_PER_REQUEST
 from modules.blockchain.blockchain import Blockchain
 from modules.mining.miner import Miner
 from modules.wallet.wallet import WalletManager
@@ -57,12 +58,20 @@ class ColoredFormatter(logging.Formatter):
             record.msg = f"{self.COLORS[record.levelname]}{record.msg}{Style.RESET_ALL}"
         return super().format(record)
 
-# Configure logging
+# Configure logging; the handler goes on the root logger in configure_logging()
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
 handler = logging.StreamHandler()
 handler.setFormatter(ColoredFormatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s'))
-logger.addHandler(handler)
+
+def configure_logging() -> None:
+    """Send records from every module (PeerNetwork, KademliaDHT, ...) through one colored root handler."""
+    logging.basicConfig(level=logging.INFO, handlers=[handler])
+
+def _encode_chain(blockchain: Blockchain) -> bytes:
+    """Render the /chain response body with the same JSON settings FastAPI uses."""
+    chain_json, length = blockchain.get_chain_json()
+    return f'{{"chain":{chain_json},"length":{length}}}'.encode('utf-8')
 
 class NodeError(Exception):
     """Base exception for node-related errors."""
@@ -158,7 +167,7 @@ class Node:
                 
             for peer in self.peers:
                 try:
-                    response = requests.get(
+                    response = http_session.get(
                         f"http://{peer}/status",
                         timeout=5
                     )
@@ -238,7 +247,7 @@ class Node:
                     raise HTTPException(status_code=400, detail="Missing host or port in request")
                 host = data['host']
                 port = int(data['port'])
-                success = node.peer_network._connect_to_peer(host, port)
+                success = await asyncio.to_thread(node.peer_network._connect_to_peer, host, port)
                 if success:
                     return {
                         'message': f'Successfully connected to peer {host}:{port}',
@@ -299,7 +308,8 @@ class Node:
         @app.get('/balance/{address}')
         async def get_balance(address: str):
             try:
-                balance = node.blockchain.get_balance(address)
+                # Scans every block; run it off the event loop
+                balance = await asyncio.to_thread(node.blockchain.get_balance, address)
                 return {'balance': balance}
             except ValueError as e:
                 raise HTTPException(status_code=400, detail=str(e))
@@ -332,17 +342,51 @@ class Node:
                 logger.error(f"Error creating transaction: {e}")
                 raise HTTPException(status_code=500, detail="Failed to create transaction")
 
+        @app.post('/block')
+        @app.post('/transactions')
+        async def receive_gossip(request: Request):
+            """Accept block and transaction broadcasts from peers (msgpack or legacy JSON)."""
+            try:
+                await node.peer_network.handle_gossip(await request.body())
+                return {'status': 'accepted'}
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+            except Exception as e:
+                logger.error(f"Error handling peer broadcast: {e}")
+                raise HTTPException(status_code=500, detail="Failed to handle broadcast")
+
         @app.get('/chain')
         async def get_chain():
             try:
-                return {
-                    'chain': [block.to_dict() for block in node.blockchain.chain],
-                    'length': len(node.blockchain.chain)
-                }
+                # Building and encoding every block is CPU-bound; keep it off the event loop
+                body = await asyncio.to_thread(_encode_chain, node.blockchain)
+                return Response(content=body, media_type='application/json')
             except Exception as e:
                 logger.error(f"Error getting chain: {e}")
                 raise HTTPException(status_code=500, detail="Failed to get blockchain")
 
+        @app.get('/blocks')
+        async def get_blocks(start_height: int = 0, end_height: Optional[int] = None):
+            """Serve a contiguous block range to a peer syncing from this node."""
+            try:
+                # Blocks reach storage both from local mining and from peer sync/gossip
+                height = max(node.peer_network.miner.height, len(node.blockchain.chain) - 1)
+                end_height = height if end_height is None else min(end_height, height)
+                end_height = min(end_height, start_height + MAX_BLOCKS_PER_REQUEST - 1)
+                blocks = await asyncio.to_thread(
+                    node.peer_network.storage.load_blocks_by_height_range, start_height, end_height
+                )
+                # Stop at the first gap so the caller only ever receives a linkable run
+                contiguous = []
+                for block in blocks:
+                    if block is None:
+                        break
+                    contiguous.append(block)
+                return {'blocks': contiguous}
+            except Exception as e:
+                logger.error(f"Error getting blocks: {e}")
+                raise HTTPException(status_code=500, detail="Failed to get blocks")
+
         # Add a simple health check endpoint
         @app.get('/health')
         async def health_check():
@@ -626,6 +670,7 @@ def load_config() -> Dict[str, Any]:
         return default_config
 
 def main():
+    configure_logging()
     try:
         # Parse command line arguments
         parser = argparse.ArgumentParser(description='ZiaCoin Node')
@@ -667,7 +712,7 @@ def main():
             
             # Create a proxy API server that connects to the node
             from fastapi import FastAPI, Request, HTTPException
-            from fastapi.responses import JSONResponse
+            from fastapi.responses import JSONResponse, Response
             import requests
             
             app = FastAPI()
@@ -697,7 +742,7 @@ def main():
             async def get_status():
                 """Proxy status request to node backend."""
                 try:
-                    response = requests.get(f"{NODE_BACKEND_URL}/status", timeout=5)
+                    response = http_session.get(f"{NODE_BACKEND_URL}/status", timeout=5)
                     if response.status_code == 200:
                         data = response.json()
                         data['api_server'] = 'frontend'
@@ -714,7 +759,7 @@ def main():
             async def get_peers():
                 """Proxy peers request to node backend."""
                 try:
-                    response = requests.get(f"{NODE_BACKEND_URL}/peers", timeout=5)
+                    response = http_session.get(f"{NODE_BACKEND_URL}/peers", timeout=5)
                     if response.status_code == 200:
                         return response.json()
                     else:
@@ -728,7 +773,7 @@ def main():
             async def get_network():
                 """Proxy network request to node backend."""
                 try:
-                    response = requests.get(f"{NODE_BACKEND_URL}/network", timeout=5)
+                    response = http_session.get(f"{NODE_BACKEND_URL}/network", timeout=5)
                     if response.status_code == 200:
                         return response.json()
                     else:
@@ -742,7 +787,7 @@ def main():
             async def get_chain():
                 """Proxy chain request to node backend."""
                 try:
-                    response = requests.get(f"{NODE_BACKEND_URL}/chain", timeout=10)
+                    response = http_session.get(f"{NODE_BACKEND_URL}/chain", timeout=10)
                     if response.status_code == 200:
                         return response.json()
                     else:
@@ -756,7 +801,7 @@ def main():
             async def get_balance(address: str):
                 """Proxy balance request to node backend."""
                 try:
-                    response = requests.get(f"{NODE_BACKEND_URL}/balance/{address}", timeout=5)
+                    response = http_session.get(f"{NODE_BACKEND_URL}/balance/{address}", timeout=5)
                     if response.status_code == 200:
                         return response.json()
                     else:
@@ -771,7 +816,7 @@ def main():
                 """Proxy transaction request to node backend."""
                 try:
                     data = await request.json()
-                    response = requests.post(f"{NODE_BACKEND_URL}/transaction", json=data, timeout=10)
+                    response = http_session.post(f"{NODE_BACKEND_URL}/transaction", json=data, timeout=10)
                     if response.status_code == 200:
                         return response.json()
                     else:
@@ -785,7 +830,7 @@ def main():
             async def health_check():
                 """Health check that also checks backend connectivity."""
                 try:
-                    response = requests.get(f"{NODE_BACKEND_URL}/health", timeout=5)
+                    response = http_session.get(f"{NODE_BACKEND_URL}/health", timeout=5)
                     if response.status_code == 200:
                         return {
                             'status': 'healthy',
@@ -11,7 +11,6 @@ import json
 import requests
 import argparse
 import threading
-from datetime import datetime
 
 # Add the modules directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(__file__), 'modules'))
@@ -57,7 +56,7 @@ class MiningController:
                 'sender': 'network',
                 'recipient': 'miner_reward',
                 'amount': 50,
-                'timestamp': datetime.utcnow().isoformat()
+                'timestamp': time.time()
             }
         ]
         
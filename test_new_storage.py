@@ -29,7 +29,7 @@ def test_new_storage():
         # Check if blocks are in new storage
         chain_blocks_dir = "chain/blocks"
         if os.path.exists(chain_blocks_dir):
-            block_files = [f for f in os.listdir(chain_blocks_dir) if f.endswith('.json')]
+            block_files = [f for f in os.listdir(chain_blocks_dir) if f.endswith('.mp')]
             print_success(f"✅ New storage format working!")
             print_info(f"   Blocks in chain/blocks/: {len(block_files)}")
             print_info(f"   Blocks in memory: {len(blockchain.chain)}")
@@ -71,7 +71,7 @@ def test_new_storage():
         print_info(f"   Block hash: {new_block.block_hash[:16]}...")
         
         # Check if new block appears in storage
-        updated_block_files = [f for f in os.listdir(chain_blocks_dir) if f.endswith('.json')]
+        updated_block_files = [f for f in os.listdir(chain_blocks_dir) if f.endswith('.mp')]
         print_info(f"   Total blocks in storage: {len(updated_block_files)}")
         
         print()